@@ -12,10 +12,20 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-""" Logging utilities. """
+""" Logging utilities.
+
+Messages that are expensive to build can be wrapped in a :class:`LazyStr`, so that they are only built if the record
+is actually emitted::
+
+    logger = datasets.logging.get_logger(__name__)
+    logger.debug(datasets.logging.LazyStr(lambda: repr(big_object)))
+
+Alternatively, :func:`is_enabled_for` can be used to skip a whole block of code when the level is disabled.
+"""
 
 import logging
 import threading
+from contextlib import contextmanager
 from logging import CRITICAL  # NOQA
 from logging import DEBUG  # NOQA
 from logging import ERROR  # NOQA
@@ -24,46 +34,57 @@ from logging import INFO  # NOQA
 from logging import NOTSET  # NOQA
 from logging import WARN  # NOQA
 from logging import WARNING  # NOQA
-from typing import Optional
+from typing import Any, Callable, Optional
 
 
-_lock = threading.Lock()
+_lock = threading.RLock()
 _default_handler: Optional[logging.Handler] = None
+_library_root_logger: Optional[logging.Logger] = None
 
-
-def _get_library_name() -> str:
-
-    return __name__.split(".")[0]
+_LIBRARY_NAME = __name__.split(".")[0]
 
 
 def _get_library_root_logger() -> logging.Logger:
 
-    return logging.getLogger(_get_library_name())
+    return logging.getLogger(_LIBRARY_NAME)
 
 
 def _configure_library_root_logger() -> None:
 
     global _default_handler
+    global _library_root_logger
+
+    if _default_handler is not None:
+        # Fast path: the library root logger is already configured, no need to take the lock.
+        return
 
     with _lock:
-        if _default_handler:
-            # This library has already configured the library root logger.
+        if _default_handler is not None:
+            # Another thread configured the library root logger while we were waiting for the lock.
             return
-        _default_handler = logging.StreamHandler()  # Set sys.stderr as stream.
+        default_handler = logging.StreamHandler()  # Set sys.stderr as stream.
 
         # Apply our default configuration to the library root logger.
         library_root_logger = _get_library_root_logger()
-        library_root_logger.addHandler(_default_handler)
+        library_root_logger.addHandler(default_handler)
         library_root_logger.setLevel(logging.INFO)
         library_root_logger.propagate = False
+        _library_root_logger = library_root_logger
+        # Set last since it is read without the lock to know whether the configuration is done.
+        _default_handler = default_handler
 
 
 def _reset_library_root_logger() -> None:
 
     global _default_handler
 
+    if _default_handler is None:
+        # Fast path: the library root logger is not configured, no need to take the lock.
+        return
+
     with _lock:
-        if not _default_handler:
+        if _default_handler is None:
+            # Another thread reset the library root logger while we were waiting for the lock.
             return
 
         library_root_logger = _get_library_root_logger()
@@ -72,13 +93,20 @@ def _reset_library_root_logger() -> None:
         _default_handler = None
 
 
+def flush() -> None:
+    """Flush the stream of the HuggingFace datasets library's default handler."""
+
+    if _default_handler is not None:
+        _default_handler.flush()
+
+
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     """Return a logger with the specified name.
     This function can be used in dataset and metrics scripts.
     """
 
     if name is None:
-        name = _get_library_name()
+        name = _LIBRARY_NAME
 
     _configure_library_root_logger()
     return logging.getLogger(name)
@@ -98,7 +126,7 @@ def get_verbosity() -> int:
     """
 
     _configure_library_root_logger()
-    return _get_library_root_logger().getEffectiveLevel()
+    return _library_root_logger.getEffectiveLevel()
 
 
 def set_verbosity(verbosity: int) -> None:
@@ -109,7 +137,18 @@ def set_verbosity(verbosity: int) -> None:
     """
 
     _configure_library_root_logger()
-    _get_library_root_logger().setLevel(verbosity)
+    _library_root_logger.setLevel(verbosity)
+
+
+def is_enabled_for(level: int) -> bool:
+    """Return whether a message of severity ``level`` would be processed by the HuggingFace datasets library's root
+    logger.
+    It takes into account levels set with the standard logging API as well, and is cheap enough to guard the
+    formatting of expensive log messages, e.g. ``if datasets.logging.is_enabled_for(datasets.logging.DEBUG): ...``.
+    """
+
+    _configure_library_root_logger()
+    return _library_root_logger.isEnabledFor(level)
 
 
 def set_verbosity_info():
@@ -156,18 +195,20 @@ def disable_default_handler() -> None:
     """Disable the default handler of the HuggingFace datasets library's root logger."""
 
     _configure_library_root_logger()
+    if _default_handler not in _library_root_logger.handlers:
+        return
 
-    assert _default_handler is not None
-    _get_library_root_logger().removeHandler(_default_handler)
+    _library_root_logger.removeHandler(_default_handler)
 
 
 def enable_default_handler() -> None:
     """Enable the default handler of the HuggingFace datasets library's root logger."""
 
     _configure_library_root_logger()
+    if _default_handler in _library_root_logger.handlers:
+        return
 
-    assert _default_handler is not None
-    _get_library_root_logger().addHandler(_default_handler)
+    _library_root_logger.addHandler(_default_handler)
 
 
 def disable_propagation() -> None:
@@ -176,7 +217,7 @@ def disable_propagation() -> None:
     """
 
     _configure_library_root_logger()
-    _get_library_root_logger().propagate = False
+    _library_root_logger.propagate = False
 
 
 def enable_propagation() -> None:
@@ -186,4 +227,37 @@ def enable_propagation() -> None:
     """
 
     _configure_library_root_logger()
-    _get_library_root_logger().propagate = True
+    _library_root_logger.propagate = True
+
+
+@contextmanager
+def no_propagation():
+    """Context manager that disables propagation of the library log outputs, and restores the previous propagation
+    setting on exit.
+    """
+
+    _configure_library_root_logger()
+    propagate = _library_root_logger.propagate
+    _library_root_logger.propagate = False
+    try:
+        yield
+    finally:
+        _library_root_logger.propagate = propagate
+
+
+class LazyStr:
+    """A log message that is only built when the record is emitted.
+    ``fn`` is called, and its result converted to a string, each time the message is formatted, so nothing is done
+    if the level of the record is disabled.
+
+    Args:
+        fn: Callable without arguments that returns the message.
+    """
+
+    __slots__ = ("_fn",)
+
+    def __init__(self, fn: Callable[[], Any]):
+        self._fn = fn
+
+    def __str__(self) -> str:
+        return str(self._fn())
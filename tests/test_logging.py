@@ -0,0 +1,99 @@
+import io
+import logging as python_logging
+from unittest import TestCase
+from unittest.mock import patch
+
+from datasets.utils import logging
+
+
+class LoggingTest(TestCase):
+    def setUp(self):
+        self._verbosity = logging.get_verbosity()
+        self._propagate = python_logging.getLogger("datasets").propagate
+
+    def tearDown(self):
+        logging.set_verbosity(self._verbosity)
+        python_logging.getLogger("datasets").propagate = self._propagate
+
+    def test_is_enabled_for_after_set_verbosity(self):
+        logging.set_verbosity_warning()
+        self.assertFalse(logging.is_enabled_for(logging.INFO))
+        self.assertTrue(logging.is_enabled_for(logging.WARNING))
+        logging.set_verbosity(logging.DEBUG)
+        self.assertTrue(logging.is_enabled_for(logging.DEBUG))
+
+    def test_is_enabled_for_after_set_level(self):
+        logging.set_verbosity_info()
+        python_logging.getLogger("datasets").setLevel(python_logging.DEBUG)
+        self.assertTrue(logging.is_enabled_for(logging.DEBUG))
+        self.assertEqual(logging.get_verbosity(), logging.DEBUG)
+
+    def test_is_enabled_for_after_reset(self):
+        logging.set_verbosity_error()
+        logging._reset_library_root_logger()
+        # the library root logger is configured again with the default INFO level
+        self.assertTrue(logging.is_enabled_for(logging.INFO))
+        self.assertFalse(logging.is_enabled_for(logging.DEBUG))
+
+    def test_set_verbosity_shortcut_after_reset(self):
+        logging._reset_library_root_logger()
+        logging.set_verbosity_warning()
+        self.assertIn(logging._default_handler, python_logging.getLogger("datasets").handlers)
+        self.assertEqual(logging.get_verbosity(), logging.WARNING)
+
+    def test_default_handler_idempotent(self):
+        library_root_logger = python_logging.getLogger("datasets")
+        logging.disable_default_handler()
+        logging.disable_default_handler()
+        self.assertNotIn(logging._default_handler, library_root_logger.handlers)
+        logging.enable_default_handler()
+        logging.enable_default_handler()
+        self.assertEqual(library_root_logger.handlers.count(logging._default_handler), 1)
+        # the handler is attached again even if it was removed with the standard logging API
+        library_root_logger.removeHandler(logging._default_handler)
+        logging.enable_default_handler()
+        self.assertIn(logging._default_handler, library_root_logger.handlers)
+
+    def test_flush(self):
+        logger = logging.get_logger("datasets.test_logging")
+        stream = io.StringIO()
+        with patch.object(logging._default_handler, "stream", stream), patch.object(stream, "flush") as mocked_flush:
+            logger.warning("foo")
+            logging.flush()
+            self.assertEqual(stream.getvalue(), "foo\n")
+            mocked_flush.assert_called()
+
+    def test_flush_without_default_handler(self):
+        logging._reset_library_root_logger()
+        logging.flush()  # doesn't configure the library root logger nor raise
+        self.assertIsNone(logging._default_handler)
+
+    def test_lazy_str(self):
+        logger = logging.get_logger("datasets.test_logging")
+        calls = []
+
+        def build_message():
+            calls.append(None)
+            return "foo"
+
+        logging.set_verbosity_info()
+        with patch.object(logging._default_handler, "stream", io.StringIO()) as stream:
+            logger.debug(logging.LazyStr(build_message))
+            self.assertEqual(calls, [])
+            logger.info(logging.LazyStr(build_message))
+            # other handlers, e.g. pytest's capture handlers, may format the record again
+            self.assertGreaterEqual(len(calls), 1)
+            self.assertEqual(stream.getvalue(), "foo\n")
+
+    def test_no_propagation(self):
+        library_root_logger = python_logging.getLogger("datasets")
+        for propagate in (True, False):
+            library_root_logger.propagate = propagate
+            with logging.no_propagation():
+                self.assertFalse(library_root_logger.propagate)
+            self.assertEqual(library_root_logger.propagate, propagate)
+        logging.enable_propagation()
+        with self.assertRaises(ValueError):
+            with logging.no_propagation():
+                raise ValueError()
+        self.assertTrue(library_root_logger.propagate)